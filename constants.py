@@ -17,6 +17,16 @@ BASE_SPECIES_COLUMNS = [
   'bin'
 ]
 
+# Maximum predator_N / prey_N relationship columns per species row
+MAX_RELATIONSHIP_COLUMNS = 7
+
+# Full Species sheet layout: base columns followed by the relationship columns
+SPECIES_COLUMNS = (
+  BASE_SPECIES_COLUMNS +
+  [f'predator_{i}' for i in range(1, MAX_RELATIONSHIP_COLUMNS + 1)] +
+  [f'prey_{i}' for i in range(1, MAX_RELATIONSHIP_COLUMNS + 1)]
+)
+
 # Calorie Constants
 MIN_CALORIES = 1000
 MAX_CALORIES = 6000
@@ -37,11 +47,16 @@ ERROR_MESSAGES = {
   'invalid_bin': 'Not all species can coexist in the same bin',
   'invalid_relationships': 'Too many cross-bin relationships detected',
   'no_solution_in_bin': 'No valid solution found in bin {}',
+  'insufficient_total_calories': 'Total calories provided cannot cover the calories needed',
+  'feeding_failed': 'Feeding simulation failed',
+  'relationships_failed': 'Species relationships are invalid',
 }
 
 # Generation Parameters
 MAX_ATTEMPTS_PER_BIN = 1000  # Maximum number of attempts to find solution in a bin
 SOLUTION_TIMEOUT = 300  # Maximum seconds to spend looking for solutions
+PARALLEL_BIN_SEARCH = False  # Search each bin in its own process when finding solutions
+FEEDING_CACHE_SIZE = 10000  # Finished feeding simulations kept for reuse
 
 # Scoring Weights
 SCORING_WEIGHTS = {
@@ -1,159 +1,249 @@
+import math
+import threading
 from typing import List, Dict, Tuple, Set, Optional
-from species import Species, SpeciesType, Ecosystem
-from constants import (
-    MIN_CALORIES,
-    MAX_CALORIES,
-    CALORIE_STEP
-)
+from species import Species, SpeciesType
+from constants import FEEDING_CACHE_SIZE
+
+# Successful simulations keyed by feeding_signature, oldest first. Failed candidates are
+# never looked up again (they are neither ranked nor shown), so they are not kept.
+_FEEDING_CACHE: Dict[Tuple, 'FeedingSimulation'] = {}
+# Streamlit runs sessions in threads, so evict-and-insert must not interleave
+_FEEDING_CACHE_LOCK = threading.Lock()
+
+def feeding_signature(species: List[Species]) -> Tuple:
+    """Everything about a solution that can change the outcome of its feeding simulation"""
+    return tuple(
+        (s.id, s.species_type, s.calories_provided, s.calories_needed, frozenset(s.prey))
+        for s in species
+    )
+
+def simulate_feeding(species: List[Species], reuse: bool = True) -> Tuple[bool, 'FeedingSimulation']:
+    """Run a feeding round without debug output, remembering successful runs.
+
+    With reuse, an earlier successful run of an identical solution is returned instead of
+    simulating again. Callers that see every solution first (the validator during generation)
+    pass reuse=False so failing candidates never pay for building a signature.
+    """
+    signature = None
+    if reuse:
+        signature = feeding_signature(species)
+        with _FEEDING_CACHE_LOCK:
+            cached = _FEEDING_CACHE.get(signature)
+        if cached is not None:
+            return True, cached
+    
+    simulation = FeedingSimulation(species)
+    success, _ = simulation.simulate_feeding_round()
+    
+    if success:
+        if signature is None:
+            signature = feeding_signature(species)
+        with _FEEDING_CACHE_LOCK:
+            if len(_FEEDING_CACHE) >= FEEDING_CACHE_SIZE:
+                del _FEEDING_CACHE[next(iter(_FEEDING_CACHE))]
+            _FEEDING_CACHE[signature] = simulation
+    return success, simulation
 
 class FeedingSimulation:
     def __init__(self, species: List[Species], debug_container=None, debug_mode=False):
         """Initialize feeding simulation with initial calories for all species"""
         self.species = species
         self.species_dict = {s.id: s for s in species}
-        self.calories_remaining = {s.id: s.calories_provided for s in species}
-        self.has_eaten = set()  # Track which species have eaten
         self.feeding_history = []
+        # Running totals for scoring, kept alongside the history so it never has to be re-read
+        self.calories_consumed = 0
+        self.feeding_pairs = set()
         self.debug_container = debug_container
         self.debug_mode = debug_mode
         
+        # Species are addressed by their position in the list while feeding, so calorie
+        # and eaten state live in plain lists instead of id-keyed dicts and sets
+        self._eaten = [False] * len(species)
+        self._animal_indices = [i for i, s in enumerate(species) if s.species_type is SpeciesType.ANIMAL]
+        
+        # Resolve each animal's prey once, in species order, so feeding never rescans the solution
+        self._prey_indices = {}
+        for i in self._animal_indices:
+            prey_ids = species[i].prey
+            self._prey_indices[i] = [j for j, p in enumerate(species) if p.id in prey_ids]
+        
+        # Calories are tracked in a unit every possible split size divides, so a demand shared
+        # evenly by tied prey stays exact and the prey stay tied
+        max_split = max((len(prey) for prey in self._prey_indices.values()), default=1)
+        self._scale = math.lcm(*range(1, max_split + 1))
+        self._calories = [s.calories_provided * self._scale for s in species]
+        
         if self.debug_mode:
             self.debug_container.write("\nInitializing Feeding Simulation:")
             self.debug_container.write(f"Total species: {len(species)}")
             self.debug_container.write("Initial calories:")
-            for s in self.species:
-                self.debug_container.write(f"- {s.name}: {self.calories_remaining[s.id]}")
+            for s, calories in zip(self.species, self._calories):
+                self.debug_container.write(f"- {s.name}: {self._unscale(calories)}")
+
+    def _unscale(self, calories: int):
+        """Convert an internal calorie amount back to calories, as an int when it is whole"""
+        whole, part = divmod(calories, self._scale)
+        return whole if part == 0 else calories / self._scale
+
+    @property
+    def calories_remaining(self) -> Dict[str, int]:
+        """Current calories of every species, keyed by species id"""
+        return {s.id: self._unscale(calories) for s, calories in zip(self.species, self._calories)}
+
+    @property
+    def has_eaten(self) -> Set[str]:
+        """Ids of the animals that have eaten"""
+        return {self.species[i].id for i in self._animal_indices if self._eaten[i]}
 
     def simulate_feeding_round(self) -> Tuple[bool, List[dict]]:
         """Simulates one complete feeding round"""
-        if self.debug_mode:
+        debug = self.debug_mode
+        cal = self._calories
+        
+        if debug:
             self.debug_container.write("\nStarting feeding simulation...")
 
         while True:
             # Find next animal with highest current calories that hasn't eaten
-            next_predator = self._get_next_predator()
-            if not next_predator:
+            next_idx = self._get_next_predator()
+            if next_idx is None:
                 break  # No more animals that need to feed
                 
-            if self.debug_mode:
+            if debug:
+                next_predator = self.species[next_idx]
                 self.debug_container.write(f"\nNext predator: {next_predator.name}")
-                self.debug_container.write(f"Current calories: {self.calories_remaining[next_predator.id]}")
+                self.debug_container.write(f"Current calories: {self._unscale(cal[next_idx])}")
                 self.debug_container.write(f"Calories needed: {next_predator.calories_needed}")
             
             # Try to feed the predator in a single sitting
-            if not self._feed_species(next_predator):
-                if self.debug_mode:
-                    self.debug_container.write(f"Failed to feed {next_predator.name}")
+            if not self._feed_species(next_idx):
+                if debug:
+                    self.debug_container.write(f"Failed to feed {self.species[next_idx].name}")
                     self.debug_container.write("Current calorie state:")
-                    for s in self.species:
-                        self.debug_container.write(f"- {s.name}: {self.calories_remaining[s.id]}")
+                    for s, calories in zip(self.species, cal):
+                        self.debug_container.write(f"- {s.name}: {self._unscale(calories)}")
                 return False, self.feeding_history
 
         # Verify all animals have eaten and no species depleted
-        for species in self.species:
-            if species.species_type == SpeciesType.ANIMAL:
-                if species.id not in self.has_eaten:
-                    if self.debug_mode:
+        for i, species in enumerate(self.species):
+            if species.species_type is SpeciesType.ANIMAL:
+                if not self._eaten[i]:
+                    if debug:
                         self.debug_container.write(f"{species.name} failed to eat")
                     return False, self.feeding_history
                 
-            if self.calories_remaining[species.id] <= 0:
-                if self.debug_mode:
-                    self.debug_container.write(f"{species.name} ended with {self.calories_remaining[species.id]} calories")
+            if cal[i] <= 0:
+                if debug:
+                    self.debug_container.write(f"{species.name} ended with {self._unscale(cal[i])} calories")
                 return False, self.feeding_history
         
-        if self.debug_mode:
+        if debug:
             self.debug_container.write("\nFeeding simulation completed successfully")
             self.debug_container.write("Final calorie state:")
-            for s in self.species:
-                self.debug_container.write(f"- {s.name}: {self.calories_remaining[s.id]}")
+            for s, calories in zip(self.species, cal):
+                self.debug_container.write(f"- {s.name}: {self._unscale(calories)}")
         
         return True, self.feeding_history
 
-    def _get_next_predator(self) -> Optional[Species]:
-        """Get next animal with highest current calories that hasn't eaten"""
-        available_predators = [s for s in self.species 
-                             if s.species_type == SpeciesType.ANIMAL 
-                             and s.id not in self.has_eaten]
-        if not available_predators:
-            return None
-        
-        return max(available_predators, key=lambda x: self.calories_remaining[x.id])
+    def _get_next_predator(self) -> Optional[int]:
+        """Get the index of the next animal with highest current calories that hasn't eaten"""
+        cal = self._calories
+        eaten = self._eaten
+        best = None
+        for i in self._animal_indices:
+            # Strict comparison keeps the first animal in species order on ties
+            if not eaten[i] and (best is None or cal[i] > cal[best]):
+                best = i
+        return best
 
-    def _feed_species(self, species: Species) -> bool:
-        """Feed a species their required calories in a single sitting"""
-        if species.id in self.has_eaten:
-            if self.debug_mode:
+    def _feed_species(self, idx: int) -> bool:
+        """Feed the species at idx their required calories in a single sitting"""
+        debug = self.debug_mode
+        species = self.species[idx]
+        
+        if self._eaten[idx]:
+            if debug:
                 self.debug_container.write(f"{species.name} has already eaten")
             return True
 
-        # Get available prey sorted by current calories
-        available_prey = self._get_available_prey(species)
+        # Get available prey with calories left
+        available_prey = self._get_available_prey(idx)
         if not available_prey:
-            if self.debug_mode:
+            if debug:
                 self.debug_container.write(f"No available prey for {species.name}")
             return False
 
         # Must fulfill all calories needed in single sitting
-        if not self._distribute_feeding(species, available_prey, species.calories_needed):
-            if self.debug_mode:
+        if not self._distribute_feeding(idx, available_prey, species.calories_needed):
+            if debug:
                 self.debug_container.write(f"Failed to feed {species.name} required calories in single sitting")
             return False
 
-        self.has_eaten.add(species.id)
+        self._eaten[idx] = True
         return True
 
-    def _distribute_feeding(self, predator: Species, prey: List[Species], calories_needed: int) -> bool:
+    def _distribute_feeding(self, predator_idx: int, prey: List[int], calories_needed: int) -> bool:
         """Distribute feeding across prey with highest equal calories"""
         if not prey:
             return False
             
-        if self.debug_mode:
-            self.debug_container.write(f"\nDistributing feeding for {predator.name}")
+        # Bind hot attributes to locals once per call
+        cal = self._calories
+        species = self.species
+        debug = self.debug_mode
+            
+        if debug:
+            self.debug_container.write(f"\nDistributing feeding for {species[predator_idx].name}")
             self.debug_container.write(f"Calories needed: {calories_needed}")
 
         # Find prey with highest current calories
-        max_current_calories = max(self.calories_remaining[p.id] for p in prey)
-        max_calorie_prey = [p for p in prey if self.calories_remaining[p.id] == max_current_calories]
+        max_current_calories = max(cal[j] for j in prey)
+        max_calorie_prey = [j for j in prey if cal[j] == max_current_calories]
 
-        # Calculate even distribution among prey with same highest calories
-        calories_per_prey = calories_needed / len(max_calorie_prey)
+        # Split the demand evenly among prey with same highest calories; the scaled unit
+        # makes the share exact, so tied prey remain tied afterwards
+        calories_per_prey = calories_needed * self._scale // len(max_calorie_prey)
+        new_calories = max_current_calories - calories_per_prey
 
         # Verify we won't deplete any prey
-        for p in max_calorie_prey:
-            new_calories = self.calories_remaining[p.id] - calories_per_prey
-            if new_calories <= 0:
-                if self.debug_mode:
-                    self.debug_container.write(f"Would deplete {p.name} to {new_calories}")
-                return False
+        if new_calories <= 0:
+            if debug:
+                self.debug_container.write(
+                    f"Would deplete {species[max_calorie_prey[0]].name} to {self._unscale(new_calories)}"
+                )
+            return False
 
         # Apply the feeding distribution
-        for p in max_calorie_prey:
-            self.calories_remaining[p.id] -= calories_per_prey
-            self.feeding_history.append({
-                "predator": predator.id,
-                "prey": p.id,
-                "calories_consumed": calories_per_prey
+        hist_append = self.feeding_history.append
+        pairs_add = self.feeding_pairs.add
+        predator_id = species[predator_idx].id
+        consumed = self._unscale(calories_per_prey)
+        self.calories_consumed += calories_needed
+        for j in max_calorie_prey:
+            cal[j] = new_calories
+            pairs_add((predator_idx, j))
+            hist_append({
+                "predator": predator_id,
+                "prey": species[j].id,
+                "calories_consumed": consumed
             })
             
-            if self.debug_mode:
+            if debug:
                 self.debug_container.write(
-                    f"Took {calories_per_prey} calories from {p.name} "
-                    f"({self.calories_remaining[p.id]} remaining)"
+                    f"Took {consumed} calories from {species[j].name} "
+                    f"({self._unscale(new_calories)} remaining)"
                 )
 
         return True
 
-    def _get_available_prey(self, species: Species) -> List[Species]:
-        """Get all available prey for a species, sorted by current remaining calories"""
-        available = [s for s in self.species 
-                    if s.id in species.prey and self.calories_remaining[s.id] > 0]
-        
-        return sorted(
-            available,
-            key=lambda x: self.calories_remaining[x.id],
-            reverse=True
-        )
+    def _get_available_prey(self, idx: int) -> List[int]:
+        """Get the indices of all prey with calories left for the species at idx, in solution order.
+
+        No sort is needed: _distribute_feeding only picks the prey sharing the highest
+        remaining calories, and keeps their solution order just as a stable sort would.
+        """
+        cal = self._calories
+        return [j for j in self._prey_indices.get(idx, []) if cal[j] > 0]
 
     def get_feeding_stats(self) -> Dict:
         """Get statistics about the feeding simulation"""
@@ -162,7 +252,7 @@ class FeedingSimulation:
             'species_fed': len(self.has_eaten),
             'total_calories_consumed': sum(f['calories_consumed'] for f in self.feeding_history),
             'feeding_interactions': len(self.feeding_history),
-            'remaining_calories': self.calories_remaining.copy(),
+            'remaining_calories': self.calories_remaining,
             'average_consumption': sum(f['calories_consumed'] for f in self.feeding_history) / 
                                  len(self.feeding_history) if self.feeding_history else 0
         }
@@ -1,9 +1,10 @@
-import pandas as pd
-from typing import List, Dict, Tuple
+from collections import defaultdict
+from typing import List, Dict, Tuple, Union, IO, TYPE_CHECKING
 from pathlib import Path
 from species import Species, SpeciesType, Ecosystem
 from constants import (
-    BASE_SPECIES_COLUMNS,
+    SPECIES_COLUMNS,
+    MAX_RELATIONSHIP_COLUMNS,
     MIN_CALORIES,
     MAX_CALORIES,
     CALORIE_STEP,
@@ -11,103 +12,103 @@ from constants import (
     PRODUCERS_PER_BIN,
     ANIMALS_PER_BIN
 )
-from openpyxl import Workbook
-from openpyxl.worksheet.datavalidation import DataValidation
+
+# pandas and openpyxl are imported where they are used so that importing this module
+# (and starting the app) does not pay for them until a workbook is read or written
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Prefer the Rust-based calamine reader when python-calamine is installed; writes stay on openpyxl
+try:
+    import python_calamine  # noqa: F401
+    READ_ENGINE = 'calamine'
+except ImportError:
+    READ_ENGINE = 'openpyxl'
+
+# Read every non-calorie column as text: skips type inference and keeps numeric ids in the
+# mostly blank relationship columns as '2' rather than '2.0', so they match the id column
+TEXT_COLUMN_DTYPES = {col: str for col in SPECIES_COLUMNS if col not in ('calories_provided', 'calories_needed')}
 
 class ExcelHandler:
     @staticmethod
-    def _get_predator_prey_columns(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    def _get_predator_prey_columns(df: 'pd.DataFrame') -> Tuple[List[str], List[str]]:
         """Get all predator and prey columns from dataframe"""
         predator_cols = [col for col in df.columns if col.startswith('predator_')]
         prey_cols = [col for col in df.columns if col.startswith('prey_')]
         return predator_cols, prey_cols
 
     @staticmethod
-    def create_template(file_path: str, all_bins: bool = True):
+    def _collect_relationships(df: 'pd.DataFrame', columns: List[str]) -> List[List[str]]:
+        """Collect the non-empty ids in the given columns for every row, in column order"""
+        if not columns:
+            return [[] for _ in range(len(df))]
+        
+        cells = df[columns].reset_index(drop=True).melt(ignore_index=False)
+        cells = cells.dropna(subset=['value'])
+        
+        # One append per relationship cell; rows without any stay absent
+        grouped = defaultdict(list)
+        for row_idx, value in zip(cells.index.tolist(), cells['value'].astype(str).tolist()):
+            grouped[row_idx].append(value)
+        return [grouped.get(i, []) for i in range(len(df))]
+
+    @staticmethod
+    def create_template(file_path: Union[str, IO[bytes]], all_bins: bool = True):
         """Create an empty template Excel file"""
         if all_bins:
             bins = BINS
         else:
             bins = ['A']  # Default to single bin
         
-        # Create DataFrame with full column set
-        columns = [
-            'id', 'name', 'type', 'calories_provided', 'calories_needed', 'bin', 
-            'predator_1', 'predator_2', 'predator_3', 'predator_4', 'predator_5', 
-            'predator_6', 'predator_7', 
-            'prey_1', 'prey_2', 'prey_3', 'prey_4', 'prey_5', 'prey_6', 'prey_7'
-        ]
+        # Empty predator and prey columns
+        blanks = [None] * (2 * MAX_RELATIONSHIP_COLUMNS)
         
-        # Prepare data
-        data = []
+        rows = []
         for bin_id in bins:
             # Add producers
             for i in range(PRODUCERS_PER_BIN):
-                row = {
-                    'id': f'P_{bin_id}_{i+1}',
-                    'name': f'Producer {bin_id}{i+1}',
-                    'type': 'producer',
-                    'calories_provided': 0,
-                    'calories_needed': 0,
-                    'bin': bin_id,
-                }
-                # Add empty predator and prey columns
-                for j in range(1, 8):
-                    row[f'predator_{j}'] = ''
-                    row[f'prey_{j}'] = ''
-                data.append(row)
+                rows.append([f'P_{bin_id}_{i+1}', f'Producer {bin_id}{i+1}', 'producer', 0, 0, bin_id] + blanks)
             
             # Add animals
             for i in range(ANIMALS_PER_BIN):
-                row = {
-                    'id': f'A_{bin_id}_{i+1}',
-                    'name': f'Animal {bin_id}{i+1}',
-                    'type': 'animal',
-                    'calories_provided': 0,
-                    'calories_needed': 0,
-                    'bin': bin_id,
-                }
-                # Add empty predator and prey columns
-                for j in range(1, 8):
-                    row[f'predator_{j}'] = ''
-                    row[f'prey_{j}'] = ''
-                data.append(row)
+                rows.append([f'A_{bin_id}_{i+1}', f'Animal {bin_id}{i+1}', 'animal', 0, 0, bin_id] + blanks)
+        
+        ExcelHandler._write_workbook(file_path, [('Species', SPECIES_COLUMNS, rows)])
+
+    @staticmethod
+    def validate_excel_format(file_path: Union[str, IO[bytes]]) -> Tuple[bool, List[str]]:
+        """Validate if Excel file (a path or an open binary stream) matches required format"""
+        import pandas as pd
+        
+        try:
+            df = pd.read_excel(file_path, sheet_name='Species', engine=READ_ENGINE, dtype=TEXT_COLUMN_DTYPES)
+        except Exception as e:
+            return False, [f"Error reading Excel file: {str(e)}"]
         
-        # Create DataFrame and save
-        df = pd.DataFrame(data)[columns]
-        df.to_excel(file_path, sheet_name='Species', index=False)
+        errors = ExcelHandler._validate_species_df(df)
+        return len(errors) == 0, errors
 
     @staticmethod
-    def validate_excel_format(file_path: str) -> Tuple[bool, List[str]]:
-        """Validate if Excel file matches required format"""
+    def _validate_species_df(df: 'pd.DataFrame') -> List[str]:
+        """Validate an already parsed Species sheet"""
         errors = []
         try:
-            df = pd.read_excel(file_path, sheet_name='Species')
-            
-            # Define expected columns
-            expected_columns = [
-                'id', 'name', 'type', 'calories_provided', 'calories_needed', 'bin', 
-                'predator_1', 'predator_2', 'predator_3', 'predator_4', 'predator_5', 
-                'predator_6', 'predator_7', 
-                'prey_1', 'prey_2', 'prey_3', 'prey_4', 'prey_5', 'prey_6', 'prey_7'
-            ]
-            
             # Check required columns
-            missing_cols = set(expected_columns) - set(df.columns)
+            missing_cols = set(SPECIES_COLUMNS) - set(df.columns)
             if missing_cols:
                 errors.append(f"Missing columns: {missing_cols}")
             
             # Validate data types
             try:
-                df['calories_provided'] = df['calories_provided'].astype(int)
-                df['calories_needed'] = df['calories_needed'].astype(int)
+                calories_provided = df['calories_provided'].astype(int)
+                df['calories_needed'].astype(int)
                 
                 # Validate calorie ranges
                 invalid_calories = df[
-                    (df['calories_provided'] % CALORIE_STEP != 0) |
-                    ((df['calories_provided'] != 0) & 
-                     ((df['calories_provided'] < MIN_CALORIES) | 
-                      (df['calories_provided'] > MAX_CALORIES)))
+                    (calories_provided % CALORIE_STEP != 0) |
+                    ((calories_provided != 0) & 
+                     ((calories_provided < MIN_CALORIES) | 
+                      (calories_provided > MAX_CALORIES)))
                 ]
                 if not invalid_calories.empty:
                     errors.append("Invalid calorie values found")
@@ -125,42 +126,52 @@ class ExcelHandler:
             if not invalid_bins.empty:
                 errors.append("Invalid bin values found")
             
-            return len(errors) == 0, errors
-            
         except Exception as e:
             errors.append(f"Error reading Excel file: {str(e)}")
-            return False, errors
+        
+        return errors
 
     @staticmethod
-    def read_scenario(file_path: str) -> Ecosystem:
-        """Read scenario from Excel file with validation"""
-        is_valid, errors = ExcelHandler.validate_excel_format(file_path)
-        if not is_valid:
+    def read_scenario(file_path: Union[str, IO[bytes]]) -> Ecosystem:
+        """Read scenario from an Excel path or binary stream with validation, parsing the workbook only once"""
+        import pandas as pd
+        
+        try:
+            df = pd.read_excel(file_path, sheet_name='Species', engine=READ_ENGINE, dtype=TEXT_COLUMN_DTYPES)
+        except Exception as e:
+            raise ValueError(f"Invalid Excel format: Error reading Excel file: {str(e)}")
+        
+        errors = ExcelHandler._validate_species_df(df)
+        if errors:
             raise ValueError(f"Invalid Excel format: {'; '.join(errors)}")
         
-        df = pd.read_excel(file_path)
         predator_cols, prey_cols = ExcelHandler._get_predator_prey_columns(df)
         species_list = []
         
-        for _, row in df.iterrows():
-            # Get all non-empty predators and prey
-            predators = [
-                str(row[col]) for col in predator_cols
-                if pd.notna(row[col])
-            ]
-            
-            prey = [
-                str(row[col]) for col in prey_cols
-                if pd.notna(row[col])
-            ]
-            
+        # Gather all non-empty predators and prey in one pass per relationship kind
+        predators_by_row = ExcelHandler._collect_relationships(df, predator_cols)
+        prey_by_row = ExcelHandler._collect_relationships(df, prey_cols)
+        
+        # Pull each column out once and walk them together rather than row by row
+        rows = zip(
+            df['id'].astype(str).tolist(),
+            df['name'].astype(str).tolist(),
+            df['type'].tolist(),
+            df['calories_provided'].astype(int).tolist(),
+            df['calories_needed'].astype(int).tolist(),
+            df['bin'].astype(str).tolist(),
+            predators_by_row,
+            prey_by_row
+        )
+        
+        for species_id, name, species_type, provided, needed, bin_id, predators, prey in rows:
             species = Species(
-                id=str(row['id']),
-                name=str(row['name']),
-                species_type=SpeciesType(row['type']),
-                calories_provided=int(row['calories_provided']),
-                calories_needed=int(row['calories_needed']),
-                bin=str(row['bin']),
+                id=species_id,
+                name=name,
+                species_type=SpeciesType(species_type),
+                calories_provided=provided,
+                calories_needed=needed,
+                bin=bin_id,
                 predators=predators,
                 prey=prey
             )
@@ -169,102 +180,52 @@ class ExcelHandler:
         return Ecosystem(species_list)
 
     @staticmethod
-    def write_scenario(ecosystem: Ecosystem, file_path: str):
+    def _species_rows(species_list: List[Species]):
+        """Yield the Species sheet rows for a list of species; unused relationship cells stay blank"""
+        padding = [None] * MAX_RELATIONSHIP_COLUMNS
+        for species in species_list:
+            predators = sorted(species.predators)[:MAX_RELATIONSHIP_COLUMNS]
+            prey = sorted(species.prey)[:MAX_RELATIONSHIP_COLUMNS]
+            yield [
+                species.id,
+                species.name,
+                species.species_type.value,
+                species.calories_provided,
+                species.calories_needed,
+                species.bin,
+            ] + predators + padding[len(predators):] + prey + padding[len(prey):]
+
+    @staticmethod
+    def _write_workbook(file_path: Union[str, IO[bytes]], sheets: List[Tuple[str, List[str], object]]):
+        """Stream (name, header, rows) sheets into a write-only workbook"""
+        from openpyxl import Workbook
+        
+        workbook = Workbook(write_only=True)
+        for sheet_name, header, rows in sheets:
+            sheet = workbook.create_sheet(sheet_name)
+            sheet.append(header)
+            for row in rows:
+                sheet.append(row)
+        workbook.save(file_path)
+
+    @staticmethod
+    def write_scenario(ecosystem: Ecosystem, file_path: Union[str, IO[bytes]]):
         """Write ecosystem to Excel file"""
-        # Define full column set
-        columns = [
-            'id', 'name', 'type', 'calories_provided', 'calories_needed', 'bin', 
-            'predator_1', 'predator_2', 'predator_3', 'predator_4', 'predator_5', 
-            'predator_6', 'predator_7', 
-            'prey_1', 'prey_2', 'prey_3', 'prey_4', 'prey_5', 'prey_6', 'prey_7'
-        ]
-        
-        data = []
-        
-        for species in ecosystem.species:
-            row = {
-                'id': species.id,
-                'name': species.name,
-                'type': species.species_type.value,
-                'calories_provided': species.calories_provided,
-                'calories_needed': species.calories_needed,
-                'bin': species.bin
-            }
-            
-            # Add predator columns (up to 7)
-            for i in range(1, 8):
-                row[f'predator_{i}'] = species.predators[i-1] if i <= len(species.predators) else ''
-            
-            # Add prey columns (up to 7)
-            for i in range(1, 8):
-                row[f'prey_{i}'] = species.prey[i-1] if i <= len(species.prey) else ''
-            
-            data.append(row)
-        
-        # Create DataFrame with full column set
-        df = pd.DataFrame(data)
-        
-        # Ensure all columns are present
-        for col in columns:
-            if col not in df.columns:
-                df[col] = ''
-        
-        # Reorder columns to match the full set
-        df = df[columns]
-        
-        # Write to Excel
-        df.to_excel(file_path, index=False, sheet_name='Species')
+        ExcelHandler._write_workbook(file_path, [
+            ('Species', SPECIES_COLUMNS, ExcelHandler._species_rows(ecosystem.species))
+        ])
 
     @staticmethod
-    def write_solution(solution: List[Species], feeding_history: List[Dict], file_path: str):
+    def write_solution(solution: List[Species], feeding_history: List[Dict], file_path: Union[str, IO[bytes]]):
         """Write solution and feeding history to Excel file"""
-        # Define full column set
-        columns = [
-            'id', 'name', 'type', 'calories_provided', 'calories_needed', 'bin', 
-            'predator_1', 'predator_2', 'predator_3', 'predator_4', 'predator_5', 
-            'predator_6', 'predator_7', 
-            'prey_1', 'prey_2', 'prey_3', 'prey_4', 'prey_5', 'prey_6', 'prey_7'
-        ]
-        
-        # Create Species data
-        species_data = []
-        
-        for species in solution:
-            row = {
-                'id': species.id,
-                'name': species.name,
-                'type': species.species_type.value,
-                'calories_provided': species.calories_provided,
-                'calories_needed': species.calories_needed,
-                'bin': species.bin
-            }
-            
-            # Add predator columns (up to 7)
-            for i in range(1, 8):
-                row[f'predator_{i}'] = species.predators[i-1] if i <= len(species.predators) else ''
-            
-            # Add prey columns (up to 7)
-            for i in range(1, 8):
-                row[f'prey_{i}'] = species.prey[i-1] if i <= len(species.prey) else ''
-            
-            species_data.append(row)
-        
-        # Create DataFrame with full column set
-        df = pd.DataFrame(species_data)
+        sheets = [('Species', SPECIES_COLUMNS, ExcelHandler._species_rows(solution))]
         
-        # Ensure all columns are present
-        for col in columns:
-            if col not in df.columns:
-                df[col] = ''
+        # Write feeding history if provided
+        if feeding_history:
+            sheets.append((
+                'Feeding_History',
+                ['predator', 'prey', 'calories_consumed'],
+                ([h['predator'], h['prey'], h['calories_consumed']] for h in feeding_history)
+            ))
         
-        # Reorder columns to match the full set
-        df = df[columns]
-        
-        # Write to Excel
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            # Write species sheet
-            df.to_excel(writer, sheet_name='Species', index=False)
-            
-            # Write feeding history if provided
-            if feeding_history:
-                pd.DataFrame(feeding_history).to_excel(writer, sheet_name='Feeding_History', index=False)
\ No newline at end of file
+        ExcelHandler._write_workbook(file_path, sheets)
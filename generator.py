@@ -1,10 +1,11 @@
 from typing import List, Set, Dict, Tuple
+import heapq
+import multiprocessing
 import random
 import time
-from itertools import combinations
 from species import Species, SpeciesType, Ecosystem
 from validator import SolutionValidator
-from ecosystem import FeedingSimulation
+from ecosystem import FeedingSimulation, simulate_feeding
 from constants import (
     BINS, 
     PRODUCERS_PER_BIN, 
@@ -19,9 +20,19 @@ from constants import (
     SAME_BIN_RELATIONSHIP_PROBABILITY,
     DIFFERENT_BIN_RELATIONSHIP_PROBABILITY,
     MAX_ATTEMPTS_PER_BIN,
-    SOLUTION_TIMEOUT
+    SOLUTION_TIMEOUT,
+    PARALLEL_BIN_SEARCH
 )
 
+# Shared validator for the common non-debug path; it holds no per-call state
+_VALIDATOR = SolutionValidator()
+
+def _get_validator(debug_container=None, debug_mode=False) -> SolutionValidator:
+    """Return the shared validator unless debug output has to be routed somewhere"""
+    if debug_mode:
+        return SolutionValidator(debug_container, debug_mode)
+    return _VALIDATOR
+
 class ScenarioGenerator:
     def __init__(self):
         self.calorie_ranges = {
@@ -40,15 +51,9 @@ class ScenarioGenerator:
         """Generate a complete scenario with valid species across all bins"""
         all_species = []
         
-        # Generate producers for each bin
-        for bin_id in BINS:
-            producers = self._generate_producers(bin_id)
-            all_species.extend(producers)
-            
-        # Generate animals for each bin
+        # Generate producers and animals for each bin in a single pass
         for bin_id in BINS:
-            animals = self._generate_animals(bin_id)
-            all_species.extend(animals)
+            all_species += self._generate_producers(bin_id) + self._generate_animals(bin_id)
             
         # Establish food chain relationships
         self._establish_relationships(all_species)
@@ -64,7 +69,7 @@ class ScenarioGenerator:
         bin_calories = {}
         for bin_id in BINS:
             producers = [s for s in species 
-                        if s.species_type == SpeciesType.PRODUCER and s.bin == bin_id]
+                        if s.species_type is SpeciesType.PRODUCER and s.bin == bin_id]
             bin_calories[bin_id] = self._calculate_bin_total_calories(producers)
         return sorted(bin_calories.items(), key=lambda x: x[1], reverse=True)
 
@@ -112,18 +117,18 @@ class ScenarioGenerator:
         
         # Assign predators to producers (2-3 predators each)
         for producer in producers:
-            num_predators = random.randint(2, 3)
-            potential_predators = animals_sorted.copy()
-            random.shuffle(potential_predators)
+            num_predators = min(random.randint(2, 3), len(animals_sorted))
             
-            for predator in potential_predators[:num_predators]:
+            for predator in random.sample(animals_sorted, num_predators):
                 predator.add_prey(producer.id)
                 producer.add_predator(predator.id)
 
         # Assign prey and predators to animals
+        # Potential prey are the animals after this one in calorie order plus the producers,
+        # so one combined list is built per bin and sliced per animal
+        prey_candidates = animals_sorted + producers
         for i, animal in enumerate(animals_sorted):
-            # Potential prey are animals with lower calories
-            potential_prey = animals_sorted[i+1:] + producers
+            potential_prey = prey_candidates[i+1:]
             
             if potential_prey:
                 num_prey = min(random.randint(2, 3), len(potential_prey))
@@ -135,13 +140,20 @@ class ScenarioGenerator:
 
     def _establish_relationships(self, species: List[Species]):
         """Establish all relationships"""
+        # Bucket species by bin and type in a single pass instead of rescanning per bin
+        producers_by_bin = {bin_id: [] for bin_id in BINS}
+        animals_by_bin = {bin_id: [] for bin_id in BINS}
+        for s in species:
+            if s.bin not in producers_by_bin:
+                continue
+            if s.species_type is SpeciesType.PRODUCER:
+                producers_by_bin[s.bin].append(s)
+            elif s.species_type is SpeciesType.ANIMAL:
+                animals_by_bin[s.bin].append(s)
+        
         # First establish same-bin relationships
         for bin_id in BINS:
-            bin_species = [s for s in species if s.bin == bin_id]
-            bin_producers = [s for s in bin_species if s.species_type == SpeciesType.PRODUCER]
-            bin_animals = [s for s in bin_species if s.species_type == SpeciesType.ANIMAL]
-            
-            self._establish_bin_relationships(bin_producers, bin_animals)
+            self._establish_bin_relationships(producers_by_bin[bin_id], animals_by_bin[bin_id])
 
 class SolutionGenerator:
     @staticmethod
@@ -158,44 +170,33 @@ class SolutionGenerator:
             solution.append(species)
             solution_ids.add(species.id)
         
-        # Create new species instances with filtered relationships
-        filtered_solution = []
-        for species in solution:
-            # Create a new instance to avoid modifying original
-            new_species = Species(
-                id=species.id,
-                name=species.name,
-                species_type=species.species_type,
-                calories_provided=species.calories_provided,
-                calories_needed=species.calories_needed,
-                bin=species.bin,
-                predators=[p for p in species.predators if p in solution_ids],
-                prey=[p for p in species.prey if p in solution_ids]
-            )
-            filtered_solution.append(new_species)
-            
-        return filtered_solution
+        # Create new species instances with filtered relationships to avoid modifying originals
+        return [species.create_copy(solution_ids) for species in solution]
 
     @staticmethod
-    def generate_solutions(ecosystem: Ecosystem, debug_container=None, debug_mode=False) -> List[List[Species]]:
-        """Generate all valid solutions"""
+    def generate_solutions(ecosystem: Ecosystem, debug_container=None, debug_mode=False,
+                           parallel=PARALLEL_BIN_SEARCH) -> List[List[Species]]:
+        """Generate all valid solutions, optionally searching each bin in its own process"""
         start_time = time.time()
         solutions = []
         
         # Try bins in order of producer calories
-        ranked_bins = ScenarioGenerator()._rank_bins_by_calories(ecosystem.species)
+        ranked_bins = sorted(
+            ((bin_id, ecosystem.get_bin_calories(bin_id)) for bin_id in BINS),
+            key=lambda x: x[1], reverse=True
+        )
+        
+        # Debug output is streamed while solving, so it always searches in this process
+        if parallel and not debug_mode:
+            return SolutionGenerator._generate_solutions_parallel(ecosystem, ranked_bins, start_time)
         
         for bin_id, calories in ranked_bins:
             if debug_mode:
                 debug_container.write(f"\nTrying bin {bin_id} (Total calories: {calories})")
             
-            bin_producers = [s for s in ecosystem.species 
-                        if s.species_type == SpeciesType.PRODUCER and s.bin == bin_id]
-            bin_animals = [s for s in ecosystem.species 
-                        if s.species_type == SpeciesType.ANIMAL and s.bin == bin_id]
-            
             bin_solutions = SolutionGenerator._generate_bin_solutions(
-                bin_producers, bin_animals, debug_container, debug_mode
+                ecosystem.get_bin_producers(bin_id), ecosystem.get_bin_animals(bin_id),
+                debug_container, debug_mode
             )
             
             solutions.extend(bin_solutions)
@@ -213,35 +214,192 @@ class SolutionGenerator:
         
         return solutions
 
+    @staticmethod
+    def _generate_solutions_parallel(ecosystem: Ecosystem, ranked_bins: List[Tuple[str, int]],
+                                     start_time: float) -> List[List[Species]]:
+        """Search every bin in its own process, applying the serial loop's timeout rules.
+
+        Results are collected in ranked bin order: the first bin is always kept, and each later
+        bin only if the timeout had not passed once the previous bin was collected. Workers still
+        searching when collection stops are terminated as the pool closes.
+        """
+        solutions = []
+        # Spawned rather than forked workers, since the app server runs sessions in threads
+        with multiprocessing.get_context('spawn').Pool(processes=len(ranked_bins)) as pool:
+            pending = [
+                pool.apply_async(
+                    SolutionGenerator._generate_bin_solutions,
+                    (ecosystem.get_bin_producers(bin_id), ecosystem.get_bin_animals(bin_id))
+                )
+                for bin_id, _ in ranked_bins
+            ]
+            for result in pending:
+                solutions.extend(result.get())
+                if time.time() - start_time > SOLUTION_TIMEOUT:
+                    break
+        
+        return solutions
+
+    @staticmethod
+    def _relationship_mask(species_ids: List[str], index: Dict[str, int]) -> int:
+        """Build a bitmask of the indexed species among the given ids"""
+        mask = 0
+        for species_id in species_ids:
+            if species_id in index:
+                mask |= 1 << index[species_id]
+        return mask
+
+    @staticmethod
+    def _masked_calories(mask: int, calories: List[int]) -> int:
+        """Sum the calories of the species whose bits are set in the mask"""
+        total = 0
+        while mask:
+            low_bit = mask & -mask
+            total += calories[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return total
+
+    @staticmethod
+    def _search_animal_combos(n_producers: int, n_species: int, producer_calories: int,
+                              prey_masks: List[int], calories_provided: List[int],
+                              calories_needed: List[int], names: List[str] = None,
+                              debug_container=None, debug_mode=False):
+        """Yield animal index combinations in itertools.combinations order, pruning partial
+        picks that no completion could turn into a valid solution.
+
+        Species are indexed as in the bin's bitmasks: producers first, then animals. A partial
+        pick is dropped when one of its animals cannot reach enough prey calories among the
+        producers, the picked animals and the animals still available, or when even the best
+        remaining animals cannot leave the calorie pool above the total demand. In debug
+        mode every pruned pick is reported using the species names.
+        """
+        producers_mask = (1 << n_producers) - 1
+        gains = [provided - needed for provided, needed in zip(calories_provided, calories_needed)]
+        
+        # Bits of the animals at index i and above, for every i
+        later_masks = [0] * (n_species + 1)
+        for i in range(n_species - 1, n_producers - 1, -1):
+            later_masks[i] = later_masks[i + 1] | (1 << i)
+        
+        def extend(start, chosen, selected_mask, surplus):
+            still_needed = TOTAL_ANIMALS_NEEDED - len(chosen)
+            if still_needed == 0:
+                yield tuple(chosen)
+                return
+            
+            for i in range(start, n_species - still_needed + 1):
+                picked = chosen + [i]
+                picked_mask = selected_mask | (1 << i)
+                reachable_mask = picked_mask | later_masks[i + 1]
+                
+                # Each picked animal must still be able to find enough prey
+                if not all(
+                    prey_masks[j] & reachable_mask and
+                    SolutionGenerator._masked_calories(prey_masks[j] & reachable_mask, calories_provided)
+                    >= calories_needed[j]
+                    for j in picked
+                ):
+                    if debug_mode:
+                        debug_container.write(
+                            f"Pruned combinations with {', '.join(names[j] for j in picked)}: "
+                            f"an animal cannot reach enough prey calories"
+                        )
+                    continue
+                
+                # The calorie pool must be able to stay above the total demand
+                new_surplus = surplus + gains[i]
+                best_rest = sum(heapq.nlargest(still_needed - 1, gains[i + 1:]))
+                if new_surplus + best_rest <= 0:
+                    if debug_mode:
+                        debug_container.write(
+                            f"Pruned combinations with {', '.join(names[j] for j in picked)}: "
+                            f"total calories cannot cover the total demand"
+                        )
+                    continue
+                
+                yield from extend(i + 1, picked, picked_mask, new_surplus)
+        
+        return extend(n_producers, [], producers_mask, producer_calories)
+
     @staticmethod
     def _generate_bin_solutions(producers: List[Species], animals: List[Species], 
                               debug_container=None, debug_mode=False) -> List[List[Species]]:
         """Generate solutions for a specific bin"""
         solutions = []
-        validator = SolutionValidator(debug_container, debug_mode)
+        validator = _get_validator(debug_container, debug_mode)
         
         if debug_mode:
             debug_container.write(f"Attempting combinations with {len(producers)} producers and {len(animals)} animals")
         
-        for animal_combo in combinations(animals, TOTAL_ANIMALS_NEEDED):
+        # Producers are shared by every candidate in the bin, so check them once
+        producers_ctx = validator.build_producer_context(producers)
+        
+        # Encode relationships as bitmasks over the bin's species so candidates that leave
+        # an animal without enough prey or a producer without predators are rejected cheaply
+        bin_species = producers + animals
+        index = {s.id: i for i, s in enumerate(bin_species)}
+        prey_masks = [SolutionGenerator._relationship_mask(s.prey, index) for s in bin_species]
+        predator_masks = [SolutionGenerator._relationship_mask(s.predators, index) for s in bin_species]
+        calories_provided = [s.calories_provided for s in bin_species]
+        calories_needed = [s.calories_needed for s in bin_species]
+        producers_mask = (1 << len(producers)) - 1
+        
+        names = [s.name for s in bin_species]
+        animal_combos = SolutionGenerator._search_animal_combos(
+            len(producers), len(bin_species), producers_ctx['total_calories'],
+            prey_masks, calories_provided, calories_needed, names, debug_container, debug_mode
+        )
+        
+        for animal_indices in animal_combos:
+            selected_mask = producers_mask
+            for i in animal_indices:
+                selected_mask |= 1 << i
+            
+            if not all(predator_masks[i] & selected_mask for i in range(len(producers))):
+                if debug_mode:
+                    debug_container.write(
+                        f"Skipped {', '.join(names[i] for i in animal_indices)}: a producer has no predator"
+                    )
+                continue
+            feedable = True
+            for i in animal_indices:
+                available = prey_masks[i] & selected_mask
+                if (not available or
+                        SolutionGenerator._masked_calories(available, calories_provided) < calories_needed[i]):
+                    feedable = False
+                    break
+            if not feedable:
+                if debug_mode:
+                    debug_container.write(
+                        f"Skipped {', '.join(names[i] for i in animal_indices)}: "
+                        f"{names[i]} cannot get enough calories from its prey"
+                    )
+                continue
+            
+            animal_combo = tuple(bin_species[i] for i in animal_indices)
+            
             # Create filtered solution with only valid relationships
             solution = SolutionGenerator._create_solution_subset(producers, animal_combo)
             
             # Validate the solution
-            is_valid, _ = validator.validate_solution(Ecosystem(solution), solution)
+            is_valid, errors = validator.validate_solution_fast(producers_ctx, solution, detailed=debug_mode)
             
             if is_valid:
                 solutions.append(solution)
                 
                 if debug_mode:
                     debug_container.write(f"Found valid solution! Total solutions: {len(solutions)}")
+            elif debug_mode:
+                debug_container.write(f"Rejected {', '.join(s.name for s in animal_combo)}:")
+                for error in errors:
+                    debug_container.write(f"- {error}")
         
         return solutions
 
     @staticmethod
     def rank_solutions(solutions: List[List[Species]], debug_container=None, debug_mode=False) -> List[Tuple[List[Species], float]]:
         """Rank solutions by their score"""
-        validator = SolutionValidator(debug_container, debug_mode)
+        validator = _get_validator(debug_container, debug_mode)
         scored_solutions = []
         
         if debug_mode:
@@ -252,17 +410,27 @@ class SolutionGenerator:
             if debug_mode:
                 debug_container.write(f"\nRanking solution {i+1}/{len(solutions)}")
             
-            simulation = FeedingSimulation(solution, debug_container, debug_mode)
-            success, feeding_history = simulation.simulate_feeding_round()
+            # Skip the feeding simulation for solutions that cannot possibly pass it
+            if not validator.quick_check(solution):
+                if debug_mode:
+                    debug_container.write(f"Solution {i+1} failed quick structural check")
+                continue
+            
+            # Candidates validated during generation reuse their cached simulation
+            if debug_mode:
+                simulation = FeedingSimulation(solution, debug_container, debug_mode)
+                success, _ = simulation.simulate_feeding_round()
+            else:
+                success, simulation = simulate_feeding(solution)
             
             if success:
-                score = validator.get_solution_score(solution, feeding_history)
+                score = validator.get_simulation_score(simulation)
                 scored_solutions.append((solution, score))
                 
                 if debug_mode:
                     debug_container.write(f"Solution {i+1} score: {score:.2f}")
                     debug_container.write("Feeding history:")
-                    for feed in feeding_history:
+                    for feed in simulation.feeding_history:
                         debug_container.write(
                             f"- {feed['predator']} ate {feed['calories_consumed']} calories from {feed['prey']}"
                         )
@@ -1,10 +1,11 @@
 import streamlit as st
-import pandas as pd
-import os
+import hashlib
+import io
+from collections import Counter
 from species import Species, SpeciesType, Ecosystem
 from generator import ScenarioGenerator, SolutionGenerator
 from validator import SolutionValidator
-from ecosystem import FeedingSimulation
+from ecosystem import FeedingSimulation, simulate_feeding
 from excel_handler import ExcelHandler
 from constants import *
 
@@ -14,13 +15,31 @@ st.set_page_config(
     layout="wide"
 )
 
-def create_temp_directory():
-    if not os.path.exists("temp"):
-        os.makedirs("temp")
+@st.cache_data(show_spinner=False)
+def check_excel_format(file_bytes: bytes):
+    """Validate an uploaded workbook once per distinct file"""
+    return ExcelHandler.validate_excel_format(io.BytesIO(file_bytes))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_ecosystem(file_bytes: bytes) -> Ecosystem:
+    """Parse an uploaded workbook once per distinct file; each call gets its own copy"""
+    return ExcelHandler.read_scenario(io.BytesIO(file_bytes))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def find_ranked_solutions(scenario_bytes: bytes, parallel: bool = PARALLEL_BIN_SEARCH):
+    """Generate and rank solutions for an uploaded scenario, cached on the file contents"""
+    ecosystem = load_ecosystem(scenario_bytes)
+    solutions = SolutionGenerator.generate_solutions(ecosystem, parallel=parallel)
+    return SolutionGenerator.rank_solutions(solutions) if solutions else []
+
+@st.cache_data(show_spinner=False)
+def solution_workbook(solution) -> bytes:
+    """Render a solution as xlsx bytes once per distinct solution"""
+    buffer = io.BytesIO()
+    ExcelHandler.write_solution(solution, [], buffer)
+    return buffer.getvalue()
 
 def main():
-    create_temp_directory()
-    
     st.title("McKinsey Solve Game Helper")
     
     menu = ["Generate Scenario", "Find Solutions", "Check Solution"]
@@ -54,20 +73,21 @@ def generate_scenario_page(debug_mode):
                     st.write(f"- Animals: {stats['animals']}")
                     st.write(f"- Total calories: {stats['total_calories']}")
             
-            # Save to temporary file
-            temp_file = "temp/scenario.xlsx"
-            ExcelHandler.write_scenario(ecosystem, temp_file)
+            # Write to memory so concurrent sessions never share a file
+            scenario_file = io.BytesIO()
+            ExcelHandler.write_scenario(ecosystem, scenario_file)
             
             # Provide download button
-            with open(temp_file, "rb") as file:
-                st.download_button(
-                    label="Download Scenario",
-                    data=file,
-                    file_name="mckinsey_scenario.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            st.download_button(
+                label="Download Scenario",
+                data=scenario_file.getvalue(),
+                file_name="mckinsey_scenario.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
 def find_solutions_page(debug_mode):
+    import pandas as pd  # deferred so pages without tables start without loading pandas
+    
     st.header("Find Solutions")
     
     # Add radio button to select between single bin and all bins
@@ -79,32 +99,27 @@ def find_solutions_page(debug_mode):
     
     with col1:
         if st.button("Download Empty Template"):
-            temp_file = "temp/template.xlsx"
+            template_file = io.BytesIO()
             if bin_choice == "All Bins (3 Bins)":
-                ExcelHandler.create_template(temp_file, all_bins=True)
+                ExcelHandler.create_template(template_file, all_bins=True)
             else:  # Single Bin
-                ExcelHandler.create_template(temp_file, all_bins=False)
-            with open(temp_file, "rb") as file:
-                st.download_button(
-                    label="Download Template",
-                    data=file,
-                    file_name="mckinsey_template.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+                ExcelHandler.create_template(template_file, all_bins=False)
+            st.download_button(
+                label="Download Template",
+                data=template_file.getvalue(),
+                file_name="mckinsey_template.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
     
     with col2:
         uploaded_file = st.file_uploader("Upload Scenario", type="xlsx")
         
     if uploaded_file is not None:
         st.write("Processing uploaded file...")
-        
-        # Save uploaded file temporarily
-        temp_path = "temp/uploaded_scenario.xlsx"
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getvalue())
+        scenario_bytes = uploaded_file.getvalue()
         
         # Validate format
-        is_valid, errors = ExcelHandler.validate_excel_format(temp_path)
+        is_valid, errors = check_excel_format(scenario_bytes)
         if not is_valid:
             st.error("Invalid Excel format:")
             for error in errors:
@@ -112,84 +127,105 @@ def find_solutions_page(debug_mode):
             return
         
         try:
-            ecosystem = ExcelHandler.read_scenario(temp_path)
+            ecosystem = load_ecosystem(scenario_bytes)
             
             # Display bin analysis
             if debug_mode:
                 st.write("\nBin Analysis:")
-                ranked_bins = [(bin_id, ecosystem.get_bin_calories(bin_id)) 
-                             for bin_id in BINS]
-                ranked_bins.sort(key=lambda x: x[1], reverse=True)
+                bin_stats = {bin_id: ecosystem.get_bin_statistics(bin_id) for bin_id in BINS}
+                ranked_bins = sorted(BINS, key=lambda b: bin_stats[b]['total_calories'], reverse=True)
                 
-                for bin_id, calories in ranked_bins:
-                    st.write(f"\nBin {bin_id} (Total Producer Calories: {calories}):")
-                    stats = ecosystem.get_bin_statistics(bin_id)
+                for bin_id in ranked_bins:
+                    stats = bin_stats[bin_id]
+                    st.write(f"\nBin {bin_id} (Total Producer Calories: {stats['total_calories']}):")
                     st.write(f"- Producers: {stats['producers']}")
                     st.write(f"- Animals: {stats['animals']}")
             
+            # Results persist across reruns (e.g. download clicks) for the uploaded file
+            results_key = f"ranked_{hashlib.blake2b(scenario_bytes, digest_size=8).hexdigest()}"
+            
+            parallel = st.checkbox(
+                "Search bins in parallel",
+                value=PARALLEL_BIN_SEARCH,
+                disabled=debug_mode,
+                help="Search each bin in its own process; debug mode always searches in order"
+            )
+            
             if st.button("Generate Solutions"):
                 debug_container = st.empty()
                 
                 with st.spinner("Generating solutions..."):
-                    solutions = SolutionGenerator.generate_solutions(
-                        ecosystem, 
-                        debug_container if debug_mode else None,
-                        debug_mode
-                    )
-                    
-                    if solutions:
+                    if debug_mode:
+                        # Debug output is streamed while solving, so this path is never cached
+                        solutions = SolutionGenerator.generate_solutions(
+                            ecosystem, 
+                            debug_container,
+                            debug_mode
+                        )
                         ranked_solutions = SolutionGenerator.rank_solutions(
                             solutions,
-                            debug_container if debug_mode else None,
+                            debug_container,
                             debug_mode
-                        )
+                        ) if solutions else []
+                    else:
+                        ranked_solutions = find_ranked_solutions(scenario_bytes, parallel)
+                # Only the current upload's results are kept for the session
+                for key in [k for k in st.session_state if k.startswith("ranked_")]:
+                    del st.session_state[key]
+                st.session_state[results_key] = ranked_solutions
+            
+            ranked_solutions = st.session_state.get(results_key)
+            if ranked_solutions is not None:
+                if ranked_solutions:
+                    st.write(f"Found {len(ranked_solutions)} valid solutions")
                         
-                        st.write(f"Found {len(ranked_solutions)} valid solutions")
+                    # Build one table for every displayed solution and slice it per expander
+                    top_solutions = ranked_solutions[:10]
+                    solutions_df = pd.DataFrame.from_records(
+                        [(s.id, s.name, s.species_type.value, s.calories_provided, s.calories_needed, s.bin,
+                          ', '.join(sorted(s.predators)), ', '.join(sorted(s.prey)))
+                         for solution, _ in top_solutions for s in solution],
+                        columns=['ID', 'Name', 'Type', 'Calories Provided', 'Calories Needed', 'Bin',
+                                 'Predators', 'Prey']
+                    )
+                    row_starts = [0]
+                    for solution, _ in top_solutions:
+                        row_starts.append(row_starts[-1] + len(solution))
                         
-                        for i, (solution, score) in enumerate(ranked_solutions[:10]):
-                            with st.expander(f"Solution {i+1} (Score: {score:.2f})"):
-                                selected_bin = solution[0].bin
-                                st.write(f"Selected Bin: {selected_bin}")
+                    for i, (solution, score) in enumerate(top_solutions):
+                        with st.expander(f"Solution {i+1} (Score: {score:.2f})"):
+                            selected_bin = solution[0].bin
+                            st.write(f"Selected Bin: {selected_bin}")
                                 
-                                if debug_mode:
-                                    st.write("Solution Species IDs: {[s.id for s in solution]}")
-                                    st.write("Species Composition:")
-                                    st.write(f"- Producers: {len([s for s in solution if s.species_type == SpeciesType.PRODUCER])}")
-                                    st.write(f"- Animals: {len([s for s in solution if s.species_type == SpeciesType.ANIMAL])}")
+                            if debug_mode:
+                                st.write("Solution Species IDs: {[s.id for s in solution]}")
+                                type_counts = Counter(s.species_type for s in solution)
+                                st.write("Species Composition:")
+                                st.write(f"- Producers: {type_counts[SpeciesType.PRODUCER]}")
+                                st.write(f"- Animals: {type_counts[SpeciesType.ANIMAL]}")
                                 
-                                df = pd.DataFrame([{
-                                    'ID': s.id,
-                                    'Name': s.name,
-                                    'Type': s.species_type.value,
-                                    'Calories Provided': s.calories_provided,
-                                    'Calories Needed': s.calories_needed,
-                                    'Bin': s.bin,
-                                    'Predators': ', '.join(s.predators),
-                                    'Prey': ', '.join(s.prey)
-                                } for s in solution])
-                                st.dataframe(df)
+                            df = solutions_df.iloc[row_starts[i]:row_starts[i + 1]].reset_index(drop=True)
+                            st.dataframe(df)
                                 
-                                if debug_mode:
-                                    st.write("\nFeeding Relationships:")
-                                    for species in solution:
-                                        if species.species_type == SpeciesType.ANIMAL:
-                                            st.write(f"{species.name} eats: {', '.join([next(s.name for s in solution if s.id == prey_id) for prey_id in species.prey])}")
+                            if debug_mode:
+                                st.write("\nFeeding Relationships:")
+                                names_by_id = {s.id: s.name for s in solution}
+                                for species in solution:
+                                    if species.species_type is SpeciesType.ANIMAL:
+                                        st.write(f"{species.name} eats: {', '.join([names_by_id[prey_id] for prey_id in sorted(species.prey)])}")
                                 
-                                # Add solution download option
-                                temp_solution_file = f"temp/solution_{i+1}.xlsx"
-                                ExcelHandler.write_solution(solution, [], temp_solution_file)
-                                with open(temp_solution_file, "rb") as file:
-                                    st.download_button(
-                                        label=f"Download Solution {i+1}",
-                                        data=file,
-                                        file_name=f"solution_{i+1}.xlsx",
-                                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                        key=f"download_solution_{i}"
-                                    )
-                    else:
-                        st.warning("No valid solutions found")
-                        if debug_mode:
-                            st.write("Try analyzing a different bin or checking the relationship constraints.")
+                            # Add solution download option
+                            st.download_button(
+                                label=f"Download Solution {i+1}",
+                                data=solution_workbook(solution),
+                                file_name=f"solution_{i+1}.xlsx",
+                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                key=f"download_solution_{i}"
+                            )
+                else:
+                    st.warning("No valid solutions found")
+                    if debug_mode:
+                        st.write("Try analyzing a different bin or checking the relationship constraints.")
                         
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
@@ -197,6 +233,8 @@ def find_solutions_page(debug_mode):
                 st.exception(e)
 
 def check_solution_page(debug_mode):
+    import pandas as pd  # deferred so pages without tables start without loading pandas
+    
     st.header("Check Solution")
     
     col1, col2 = st.columns(2)
@@ -208,18 +246,9 @@ def check_solution_page(debug_mode):
         uploaded_solution = st.file_uploader("Upload Solution", type="xlsx", key="solution")
     
     if uploaded_scenario is not None and uploaded_solution is not None:
-        # Save uploaded files temporarily
-        scenario_path = "temp/check_scenario.xlsx"
-        solution_path = "temp/check_solution.xlsx"
-        
-        with open(scenario_path, "wb") as f:
-            f.write(uploaded_scenario.getvalue())
-        with open(solution_path, "wb") as f:
-            f.write(uploaded_solution.getvalue())
-        
         try:
-            ecosystem = ExcelHandler.read_scenario(scenario_path)
-            solution = ExcelHandler.read_scenario(solution_path)
+            ecosystem = load_ecosystem(uploaded_scenario.getvalue())
+            solution = load_ecosystem(uploaded_solution.getvalue())
             
             if st.button("Validate Solution"):
                 with st.spinner("Validating solution..."):
@@ -228,8 +257,13 @@ def check_solution_page(debug_mode):
                     
                     if is_valid:
                         st.success("Valid solution!")
-                        simulation = FeedingSimulation(solution.species, st if debug_mode else None, debug_mode)
-                        success, feeding_history = simulation.simulate_feeding_round()
+                        if debug_mode:
+                            simulation = FeedingSimulation(solution.species, st, debug_mode)
+                            success, feeding_history = simulation.simulate_feeding_round()
+                        else:
+                            # Reuse the simulation the validator just ran
+                            success, simulation = simulate_feeding(solution.species)
+                            feeding_history = simulation.feeding_history
                         
                         st.subheader("Feeding History")
                         df = pd.DataFrame(feeding_history)
@@ -1,12 +1,17 @@
+import sys
+from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import List, Set, Dict, Optional
 from enum import Enum
 
+# dataclass(slots=True) needs Python 3.10; older interpreters fall back to a regular __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 class SpeciesType(Enum):
     PRODUCER = "producer"
     ANIMAL = "animal"
 
-@dataclass
+@dataclass(eq=False, **_SLOTS)
 class Species:
     id: str
     name: str
@@ -14,72 +19,81 @@ class Species:
     calories_provided: int
     calories_needed: int
     bin: str  # A, B, or C
-    predators: List[str] = field(default_factory=list)  # List of predator IDs
-    prey: List[str] = field(default_factory=list)      # List of prey IDs
+    predators: Set[str] = field(default_factory=set)  # Set of predator IDs
+    prey: Set[str] = field(default_factory=set)      # Set of prey IDs
 
     def __post_init__(self):
-        # Initialize empty lists if None
-        self.predators = [] if self.predators is None else self.predators
-        self.prey = [] if self.prey is None else self.prey
+        # Intern IDs so the many set and dict lookups on them compare by identity
+        self.id = sys.intern(self.id)
+        self.bin = sys.intern(self.bin)
+        
+        # Store relationships as sets, accepting None or any iterable of IDs (e.g. Excel rows)
+        self.predators = set() if self.predators is None else {sys.intern(i) for i in self.predators}
+        self.prey = set() if self.prey is None else {sys.intern(i) for i in self.prey}
 
         # Enforce producer rules
-        if self.species_type == SpeciesType.PRODUCER:
+        if self.species_type is SpeciesType.PRODUCER:
             self.calories_needed = 0
-            self.prey = []  # Producers have no prey
-
-    def create_copy(self) -> 'Species':
-        """Create a deep copy of the species with new relationship lists"""
-        return Species(
-            id=self.id,
-            name=self.name,
-            species_type=self.species_type,
-            calories_provided=self.calories_provided,
-            calories_needed=self.calories_needed,
-            bin=self.bin,
-            predators=self.predators.copy(),
-            prey=self.prey.copy()
-        )
+            self.prey = set()  # Producers have no prey
+
+    def create_copy(self, keep_ids: Optional[Set[str]] = None) -> 'Species':
+        """Create a deep copy of the species with new relationship sets, optionally keeping only
+        relationships to keep_ids. The source is already normalised, so __post_init__ is skipped."""
+        copy = object.__new__(Species)
+        copy.id = self.id
+        copy.name = self.name
+        copy.species_type = self.species_type
+        copy.calories_provided = self.calories_provided
+        copy.calories_needed = self.calories_needed
+        copy.bin = self.bin
+        if keep_ids is None:
+            copy.predators = self.predators.copy()
+            copy.prey = self.prey.copy()
+        else:
+            copy.predators = self.predators & keep_ids
+            copy.prey = self.prey & keep_ids
+        return copy
 
     def add_predator(self, predator_id: str) -> bool:
         """Add a predator"""
         if predator_id not in self.predators:
-            self.predators.append(predator_id)
+            self.predators.add(predator_id)
             return True
         return False
 
     def add_prey(self, prey_id: str) -> bool:
         """Add a prey if not a producer"""
-        if self.species_type == SpeciesType.PRODUCER:
+        if self.species_type is SpeciesType.PRODUCER:
             return False
         if prey_id not in self.prey:
-            self.prey.append(prey_id)
+            self.prey.add(prey_id)
             return True
         return False
 
     def remove_predator(self, predator_id: str):
         """Remove a predator"""
-        if predator_id in self.predators:
-            self.predators.remove(predator_id)
+        self.predators.discard(predator_id)
 
     def remove_prey(self, prey_id: str):
         """Remove a prey"""
-        if prey_id in self.prey:
-            self.prey.remove(prey_id)
+        self.prey.discard(prey_id)
             
     def filter_relationships_by_bin(self, species_dict: Dict[str, 'Species']):
         """Filter relationships to only include species from the same bin"""
-        self.predators = [pred_id for pred_id in self.predators 
-                         if pred_id in species_dict and
-                         species_dict[pred_id].bin == self.bin]
+        self.predators = {pred_id for pred_id in self.predators 
+                          if pred_id in species_dict and
+                          species_dict[pred_id].bin == self.bin}
         
-        self.prey = [prey_id for prey_id in self.prey
-                    if prey_id in species_dict and
-                    species_dict[prey_id].bin == self.bin]
+        self.prey = {prey_id for prey_id in self.prey
+                     if prey_id in species_dict and
+                     species_dict[prey_id].bin == self.bin}
 
     def __hash__(self):
         return hash(self.id)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Species):
             return False
         return self.id == other.id
@@ -94,50 +108,66 @@ class Ecosystem:
     def __init__(self, species: List[Species]):
         self.species = species
         self.species_dict = {s.id: s for s in species}
+        
+        # Type and bin groupings are kept in step by add_species/remove_species instead of rescanned
+        self._producers = []
+        self._animals = []
+        self._by_bin = defaultdict(list)
+        self._bin_producers = defaultdict(list)
+        self._bin_animals = defaultdict(list)
+        for s in species:
+            self._index_species(s)
         self._validate_ecosystem()
 
+    def _species_groups(self, species: Species) -> List[List[Species]]:
+        """Get every cached grouping a species belongs to"""
+        if species.species_type is SpeciesType.PRODUCER:
+            return [self._producers, self._by_bin[species.bin], self._bin_producers[species.bin]]
+        return [self._animals, self._by_bin[species.bin], self._bin_animals[species.bin]]
+
+    def _index_species(self, species: Species):
+        """Add a species to its cached groupings"""
+        for group in self._species_groups(species):
+            group.append(species)
+
     def _validate_ecosystem(self):
         """Validate ecosystem consistency"""
-        solution_ids = {s.id for s in self.species}
+        solution_ids = self.species_dict.keys()
         
         for species in self.species:
             # Validate predator references
-            invalid_predators = [pred_id for pred_id in species.predators 
-                               if pred_id not in solution_ids]
+            invalid_predators = species.predators - solution_ids
             if invalid_predators:
-                raise ValueError(f"Invalid predator reference {invalid_predators[0]} in {species.name}")
+                raise ValueError(f"Invalid predator reference {min(invalid_predators)} in {species.name}")
             
             # Validate prey references
-            invalid_prey = [prey_id for prey_id in species.prey 
-                          if prey_id not in solution_ids]
+            invalid_prey = species.prey - solution_ids
             if invalid_prey:
-                raise ValueError(f"Invalid prey reference {invalid_prey[0]} in {species.name}")
+                raise ValueError(f"Invalid prey reference {min(invalid_prey)} in {species.name}")
 
     def get_producers(self) -> List[Species]:
-        """Get all producers in the ecosystem"""
-        return [s for s in self.species if s.species_type == SpeciesType.PRODUCER]
+        """Get all producers in the ecosystem, as a list the caller may modify"""
+        return list(self._producers)
 
     def get_animals(self) -> List[Species]:
-        """Get all animals in the ecosystem"""
-        return [s for s in self.species if s.species_type == SpeciesType.ANIMAL]
+        """Get all animals in the ecosystem, as a list the caller may modify"""
+        return list(self._animals)
 
     def get_species_by_bin(self, bin_id: str) -> List[Species]:
-        """Get all species in a specific bin"""
-        return [s for s in self.species if s.bin == bin_id]
+        """Get all species in a specific bin, as a list the caller may modify"""
+        return list(self._by_bin.get(bin_id, ()))
 
     def get_bin_producers(self, bin_id: str) -> List[Species]:
-        """Get producers from a specific bin"""
-        return [s for s in self.species 
-                if s.species_type == SpeciesType.PRODUCER and s.bin == bin_id]
+        """Get producers from a specific bin, as a list the caller may modify"""
+        return list(self._bin_producers.get(bin_id, ()))
 
     def get_bin_animals(self, bin_id: str) -> List[Species]:
-        """Get animals from a specific bin"""
-        return [s for s in self.species 
-                if s.species_type == SpeciesType.ANIMAL and s.bin == bin_id]
+        """Get animals from a specific bin, as a list the caller may modify"""
+        return list(self._bin_animals.get(bin_id, ()))
 
     def get_bin_calories(self, bin_id: str) -> int:
         """Get total producer calories in a bin"""
-        return sum(s.calories_provided for s in self.get_bin_producers(bin_id))
+        return sum(s.calories_provided for s in self._bin_producers.get(bin_id, ()))
 
     def get_species_by_id(self, species_id: str) -> Optional[Species]:
         """Get a species by its ID"""
@@ -148,6 +178,7 @@ class Ecosystem:
         if species.id not in self.species_dict:
             self.species.append(species)
             self.species_dict[species.id] = species
+            self._index_species(species)
 
     def remove_species(self, species_id: str):
         """Remove a species and clean up its relationships"""
@@ -166,21 +197,19 @@ class Ecosystem:
             
             # Remove from collections
             self.species.remove(species)
+            for group in self._species_groups(species):
+                group.remove(species)
             del self.species_dict[species_id]
 
     def get_species_count_by_type(self) -> Dict[SpeciesType, int]:
         """Get count of species by type"""
-        counts = {SpeciesType.PRODUCER: 0, SpeciesType.ANIMAL: 0}
-        for species in self.species:
-            counts[species.species_type] += 1
-        return counts
+        return {SpeciesType.PRODUCER: len(self._producers), SpeciesType.ANIMAL: len(self._animals)}
 
     def get_bin_statistics(self, bin_id: str) -> Dict:
         """Get statistics for a specific bin"""
-        bin_species = self.get_species_by_bin(bin_id)
         return {
-            'total_species': len(bin_species),
-            'producers': len([s for s in bin_species if s.species_type == SpeciesType.PRODUCER]),
-            'animals': len([s for s in bin_species if s.species_type == SpeciesType.ANIMAL]),
+            'total_species': len(self._by_bin.get(bin_id, ())),
+            'producers': len(self._bin_producers.get(bin_id, ())),
+            'animals': len(self._bin_animals.get(bin_id, ())),
             'total_calories': self.get_bin_calories(bin_id)
         }
\ No newline at end of file
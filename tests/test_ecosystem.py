@@ -0,0 +1,59 @@
+from species import Species, SpeciesType, Ecosystem
+from ecosystem import FeedingSimulation
+
+
+def _producer(species_id, calories):
+    return Species(species_id, species_id, SpeciesType.PRODUCER, calories, 0, 'A')
+
+
+def _animal(species_id, provided, needed, prey):
+    return Species(species_id, species_id, SpeciesType.ANIMAL, provided, needed, 'A', prey=prey)
+
+
+def test_tied_prey_stay_tied_after_an_odd_shared_demand():
+    """Two equally stocked prey split an odd demand evenly and are still tied for the next predator"""
+    species = [
+        _producer('P1', 1000),
+        _producer('P2', 1000),
+        _animal('A1', 2000, 301, ['P1', 'P2']),
+        _animal('A2', 1500, 400, ['P1', 'P2']),
+    ]
+    simulation = FeedingSimulation(species)
+    success, history = simulation.simulate_feeding_round()
+
+    assert success
+    assert simulation.calories_remaining['P1'] == simulation.calories_remaining['P2'] == 649.5
+    # The second predator still sees both prey tied, so it feeds from both
+    assert [(h['predator'], h['prey'], h['calories_consumed']) for h in history] == [
+        ('A1', 'P1', 150.5),
+        ('A1', 'P2', 150.5),
+        ('A2', 'P1', 200),
+        ('A2', 'P2', 200),
+    ]
+    assert simulation.calories_consumed == 701
+
+
+def test_whole_shares_stay_integers():
+    species = [
+        _producer('P1', 1000),
+        _producer('P2', 1000),
+        _animal('A1', 2000, 300, ['P1', 'P2']),
+    ]
+    simulation = FeedingSimulation(species)
+    success, history = simulation.simulate_feeding_round()
+
+    assert success
+    assert simulation.calories_remaining == {'P1': 850, 'P2': 850, 'A1': 2000}
+    assert all(isinstance(h['calories_consumed'], int) for h in history)
+
+
+def test_getters_do_not_expose_cached_groupings():
+    ecosystem = Ecosystem([_producer('P1', 1000), _animal('A1', 2000, 300, ['P1'])])
+    for groups in (ecosystem.get_producers(), ecosystem.get_animals(), ecosystem.get_species_by_bin('A'),
+                   ecosystem.get_bin_producers('A'), ecosystem.get_bin_animals('A')):
+        groups.clear()
+
+    assert [s.id for s in ecosystem.get_species_by_bin('A')] == ['P1', 'A1']
+    assert ecosystem.get_bin_statistics('A') == {
+        'total_species': 2, 'producers': 1, 'animals': 1, 'total_calories': 1000
+    }
@@ -0,0 +1,33 @@
+import random
+
+import generator
+from generator import ScenarioGenerator, SolutionGenerator
+
+
+def _scenario(seed):
+    random.seed(seed)
+    return ScenarioGenerator().generate_scenario()
+
+
+def _ids(solutions):
+    return [[s.id for s in solution] for solution in solutions]
+
+
+def test_parallel_bin_search_matches_serial():
+    for seed in range(4):
+        ecosystem = _scenario(seed)
+        serial = SolutionGenerator.generate_solutions(ecosystem)
+        parallel = SolutionGenerator.generate_solutions(ecosystem, parallel=True)
+        assert _ids(parallel) == _ids(serial)
+
+
+def test_parallel_bin_search_keeps_only_the_first_bin_after_a_timeout(monkeypatch):
+    monkeypatch.setattr(generator, 'SOLUTION_TIMEOUT', 0)
+    ecosystem = _scenario(0)
+    first_bin = max(generator.BINS, key=ecosystem.get_bin_calories)
+
+    serial = SolutionGenerator.generate_solutions(ecosystem)
+    parallel = SolutionGenerator.generate_solutions(ecosystem, parallel=True)
+
+    assert parallel and _ids(parallel) == _ids(serial)
+    assert all(s.bin == first_bin for solution in parallel for s in solution)
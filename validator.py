@@ -1,6 +1,6 @@
 from typing import List, Dict, Tuple, Optional
 from species import Species, SpeciesType, Ecosystem
-from ecosystem import FeedingSimulation
+from ecosystem import FeedingSimulation, simulate_feeding
 from constants import (
     TOTAL_PRODUCERS_NEEDED,
     TOTAL_ANIMALS_NEEDED,
@@ -15,17 +15,27 @@ class SolutionValidator:
 
     def validate_solution(self, ecosystem: Ecosystem, solution: List[Species]) -> Tuple[bool, List[str]]:
         """Validates if a proposed solution is valid"""
+        debug = self.debug_mode
         errors = []
         
-        if self.debug_mode:
+        if debug:
             self.debug_container.write("\nValidating solution...")
             self.debug_container.write(f"Solution size: {len(solution)} species")
         
-        # Check basic counts
-        producers = [s for s in solution if s.species_type == SpeciesType.PRODUCER]
-        animals = [s for s in solution if s.species_type == SpeciesType.ANIMAL]
+        # One pass splits producers from animals and checks they share a bin
+        producers = []
+        animals = []
+        first_bin = solution[0].bin if solution else None
+        mixed_bins = False
+        for s in solution:
+            if s.species_type is SpeciesType.PRODUCER:
+                producers.append(s)
+            else:
+                animals.append(s)
+            if s.bin != first_bin:
+                mixed_bins = True
         
-        if self.debug_mode:
+        if debug:
             self.debug_container.write(f"Producers in solution: {len(producers)}")
             self.debug_container.write(f"Animals in solution: {len(animals)}")
             self.debug_container.write("Producer calories: " + 
@@ -38,17 +48,16 @@ class SolutionValidator:
             errors.append(ERROR_MESSAGES['invalid_animal_count'])
             
         if errors:
-            if self.debug_mode:
+            if debug:
                 self.debug_container.write("Basic count validation failed:")
                 for error in errors:
                     self.debug_container.write(f"- {error}")
             return False, errors
 
         # Validate bin compatibility
-        unique_bins = set(s.bin for s in solution)
-        if len(unique_bins) > 1:
-            if self.debug_mode:
-                self.debug_container.write(f"Multiple bins detected: {unique_bins}")
+        if mixed_bins:
+            if debug:
+                self.debug_container.write(f"Multiple bins detected: {set(s.bin for s in solution)}")
             errors.append(ERROR_MESSAGES['invalid_bin'])
             return False, errors
 
@@ -58,51 +67,137 @@ class SolutionValidator:
             errors.extend(relationship_errors)
             return False, errors
 
-        # Simulate feeding rounds
-        if self.debug_mode:
+        errors.extend(self._simulate_feeding(solution))
+        return len(errors) == 0, errors
+
+    def quick_check(self, solution: List[Species]) -> bool:
+        """Cheap structural checks that must pass before a feeding simulation is worth running"""
+        if not solution:
+            return False
+        
+        producer_count = 0
+        total_provided = 0
+        total_needed = 0
+        first_bin = solution[0].bin
+        for s in solution:
+            if s.bin != first_bin:
+                return False
+            if s.species_type is SpeciesType.PRODUCER:
+                producer_count += 1
+            total_provided += s.calories_provided
+            total_needed += s.calories_needed
+        
+        # Every species must keep some calories, so the pool must exceed the total demand
+        return producer_count == TOTAL_PRODUCERS_NEEDED and total_provided > total_needed
+
+    def build_producer_context(self, producers: List[Species]) -> Dict:
+        """Precompute producer data shared by every candidate solution in a bin"""
+        return {
+            'ids': tuple(p.id for p in producers),
+            'total_calories': sum(p.calories_provided for p in producers),
+            'count_valid': len(producers) == TOTAL_PRODUCERS_NEEDED,
+            'bin': producers[0].bin if producers else None
+        }
+
+    def validate_solution_fast(self, producers_ctx: Dict, solution: List[Species],
+                               detailed: bool = True) -> Tuple[bool, List[str]]:
+        """Validate a candidate whose producers are described by a precomputed context.
+
+        The solution must list the context's producers first, followed by the animals.
+        """
+        errors = []
+
+        if not producers_ctx['count_valid']:
+            errors.append(ERROR_MESSAGES['invalid_producer_count'])
+        animals = solution[len(producers_ctx['ids']):]
+        if len(animals) != TOTAL_ANIMALS_NEEDED:
+            errors.append(ERROR_MESSAGES['invalid_animal_count'])
+        if errors:
+            return False, errors
+
+        if any(a.bin != producers_ctx['bin'] for a in animals):
+            errors.append(ERROR_MESSAGES['invalid_bin'])
+            return False, errors
+
+        # Every species must keep some calories, so the pool must exceed the total demand
+        total_needed = sum(a.calories_needed for a in animals)
+        total_provided = producers_ctx['total_calories'] + sum(a.calories_provided for a in animals)
+        if total_provided <= total_needed:
+            errors.append(ERROR_MESSAGES['insufficient_total_calories'])
+            return False, errors
+
+        relationship_errors = self._validate_relationships(solution, detailed)
+        if relationship_errors:
+            errors.extend(relationship_errors)
+            return False, errors
+
+        errors.extend(self._simulate_feeding(solution, detailed))
+        return len(errors) == 0, errors
+
+    def _simulate_feeding(self, solution: List[Species], detailed: bool = True) -> List[str]:
+        """Run the feeding simulation and describe any failures"""
+        debug = self.debug_mode
+        errors = []
+
+        if debug:
             self.debug_container.write("\nStarting feeding simulation...")
             
-        simulation = FeedingSimulation(solution, self.debug_container, self.debug_mode)
-        success, feeding_history = simulation.simulate_feeding_round()
+        if debug:
+            simulation = FeedingSimulation(solution, self.debug_container, self.debug_mode)
+            success, feeding_history = simulation.simulate_feeding_round()
+        else:
+            success, simulation = simulate_feeding(solution, reuse=False)
         
         if not success:
-            if self.debug_mode:
+            if debug:
                 self.debug_container.write("Feeding simulation failed")
             
+            if not detailed:
+                return [ERROR_MESSAGES['feeding_failed']]
+            
             # Check for specific failures
+            has_eaten = simulation.has_eaten
+            calories_remaining = simulation.calories_remaining
             for species in solution:
-                if species.species_type == SpeciesType.ANIMAL:
-                    if species.id not in simulation.has_eaten:
+                if species.species_type is SpeciesType.ANIMAL:
+                    if species.id not in has_eaten:
                         errors.append(f"{species.name} couldn't obtain required calories of {species.calories_needed}")
                 
                 # Check for depleted species
-                remaining_calories = simulation.calories_remaining[species.id]
+                remaining_calories = calories_remaining[species.id]
                 if remaining_calories <= 0:
                     errors.append(f"{species.name} would be depleted to {remaining_calories} calories")
-                    if self.debug_mode:
+                    if debug:
                         self.debug_container.write(
                             f"{species.name} would end with {remaining_calories} calories"
                         )
         
-        if self.debug_mode:
+        if debug:
             if not errors:
                 self.debug_container.write("Solution validation successful!")
                 self.debug_container.write("Final calorie states:")
+                calories_remaining = simulation.calories_remaining
                 for species in solution:
                     self.debug_container.write(
-                        f"- {species.name}: {simulation.calories_remaining[species.id]} calories remaining"
+                        f"- {species.name}: {calories_remaining[species.id]} calories remaining"
                     )
                     
-        return len(errors) == 0, errors
+        return errors
 
-    def _validate_relationships(self, solution: List[Species]) -> List[str]:
+    def _validate_relationships(self, solution: List[Species], detailed: bool = True) -> List[str]:
         """Validate relationships between species"""
+        if not detailed:
+            # Skip building a message per problem when only pass/fail matters
+            if self._relationships_valid(solution):
+                return []
+            return [ERROR_MESSAGES['relationships_failed']]
+        
         errors = []
-        solution_ids = {s.id for s in solution}
         species_dict = {s.id: s for s in solution}
+        solution_ids = species_dict.keys()
         
         for species in solution:
-            if species.species_type == SpeciesType.PRODUCER:
+            if species.species_type is SpeciesType.PRODUCER:
                 # Producers must have no prey
                 if species.prey:
                     errors.append(f"Producer {species.name} should not have prey")
@@ -118,7 +213,7 @@ class SolutionValidator:
                     continue
                 
                 # Validate prey references
-                invalid_prey = set(species.prey) - solution_ids
+                invalid_prey = species.prey - solution_ids
                 if invalid_prey:
                     errors.append(f"Invalid prey references in {species.name}: {invalid_prey}")
 
@@ -132,37 +227,77 @@ class SolutionValidator:
                         f"available from prey is {potential_calories}"
                     )
 
-            # Validate bi-directional relationships
-            for prey_id in species.prey:
-                if prey_id in species_dict:
-                    prey = species_dict[prey_id]
-                    if species.id not in prey.predators:
-                        errors.append(
-                            f"Inconsistent relationship: {species.name} lists {prey.name} as prey "
-                            f"but is not listed as its predator"
-                        )
+            # Validate bi-directional relationships, reporting prey in a stable order
+            inconsistent = [prey_id for prey_id in species.prey
+                            if prey_id in species_dict and species.id not in species_dict[prey_id].predators]
+            for prey_id in sorted(inconsistent):
+                errors.append(
+                    f"Inconsistent relationship: {species.name} lists {species_dict[prey_id].name} as prey "
+                    f"but is not listed as its predator"
+                )
         
         return errors
 
+    def _relationships_valid(self, solution: List[Species]) -> bool:
+        """Run the _validate_relationships checks, stopping at the first failure"""
+        species_dict = {s.id: s for s in solution}
+        
+        for species in solution:
+            if species.species_type is SpeciesType.PRODUCER:
+                if species.prey or species.calories_needed != 0 or not species.predators:
+                    return False
+                continue
+            
+            # Animals need prey, all inside the solution, able to cover their needs
+            if not species.prey or not species.prey <= species_dict.keys():
+                return False
+            if sum(species_dict[prey_id].calories_provided for prey_id in species.prey) < species.calories_needed:
+                return False
+            if any(species.id not in species_dict[prey_id].predators for prey_id in species.prey):
+                return False
+        
+        return True
+
     def get_solution_score(self, solution: List[Species], feeding_history: List[Dict]) -> float:
         """Calculate a score for the solution"""
-        if self.debug_mode:
+        total_calories_consumed = 0
+        pairs = set()
+        for h in feeding_history:
+            total_calories_consumed += h['calories_consumed']
+            pairs.add((h['predator'], h['prey']))
+        return self._score(solution, total_calories_consumed, len(pairs))
+
+    def get_simulation_score(self, simulation: FeedingSimulation) -> float:
+        """Calculate a score from a finished simulation's running totals"""
+        return self._score(simulation.species, simulation.calories_consumed, len(simulation.feeding_pairs))
+
+    def _score(self, solution: List[Species], total_calories_consumed: int, unique_relationships: int) -> float:
+        """Combine the scoring components for a solution"""
+        debug = self.debug_mode
+        
+        if debug:
             self.debug_container.write("\nCalculating solution score...")
         
+        # Count producers and animal demand in one pass
+        producer_count = 0
+        total_calories_needed = 0
+        for s in solution:
+            if s.species_type is SpeciesType.PRODUCER:
+                producer_count += 1
+            else:
+                total_calories_needed += s.calories_needed
+        
         # Calculate caloric efficiency
-        total_calories_needed = sum(s.calories_needed for s in solution if s.species_type == SpeciesType.ANIMAL)
-        total_calories_consumed = sum(h['calories_consumed'] for h in feeding_history)
         caloric_efficiency = total_calories_needed / total_calories_consumed if total_calories_consumed > 0 else 0
         
         # Calculate relationship complexity
-        unique_relationships = len(set((h['predator'], h['prey']) for h in feeding_history))
         max_possible_relationships = TOTAL_ANIMALS_NEEDED * (TOTAL_PRODUCERS_NEEDED + TOTAL_ANIMALS_NEEDED - 1)
         relationship_complexity = unique_relationships / max_possible_relationships if max_possible_relationships > 0 else 0
         
         # Calculate producer ratio
-        producer_ratio = len([s for s in solution if s.species_type == SpeciesType.PRODUCER]) / len(solution)
+        producer_ratio = producer_count / len(solution)
         
-        if self.debug_mode:
+        if debug:
             self.debug_container.write(f"Caloric efficiency: {caloric_efficiency:.2f}")
             self.debug_container.write(f"Relationship complexity: {relationship_complexity:.2f}")
             self.debug_container.write(f"Producer ratio: {producer_ratio:.2f}")
@@ -174,7 +309,7 @@ class SolutionValidator:
             producer_ratio * SCORING_WEIGHTS['producer_ratio']
         )
         
-        if self.debug_mode:
+        if debug:
             self.debug_container.write(f"Final score: {score:.2f}")
         
         return score
\ No newline at end of file